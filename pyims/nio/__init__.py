@@ -1,3 +1,4 @@
+import threading
 from typing import Optional
 
 from .inet import InetAddress
@@ -6,14 +7,16 @@ from .sockets import TcpSocket, TcpServerSocket, UdpSocket
 
 
 _SELECTOR_THREAD: Optional[SelectorThread] = None
+_SELECTOR_THREAD_LOCK = threading.Lock()
 
 
 def get_default_selector() -> Selector:
     global _SELECTOR_THREAD
-    if _SELECTOR_THREAD is None:
-        _SELECTOR_THREAD = SelectorThread()
+    with _SELECTOR_THREAD_LOCK:
+        if _SELECTOR_THREAD is None:
+            _SELECTOR_THREAD = SelectorThread()
 
-    return _SELECTOR_THREAD.selector
+        return _SELECTOR_THREAD.selector
 
 
 def create_tcp_socket(
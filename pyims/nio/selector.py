@@ -4,6 +4,7 @@ import threading
 import os
 import time
 import logging
+import itertools
 from abc import ABC, abstractmethod
 from typing import Callable, Dict, List, Tuple
 from collections import deque
@@ -88,6 +89,7 @@ class SelectorRegistration(ABC):
 
 
 class TcpRegistration(SelectorRegistration):
+    MAX_WRITE_BUFFERS = 64  # to not over saturate on write
 
     def __init__(self, resource: socket.socket,
                  read_callback: Callable[[bytes], None],
@@ -125,6 +127,12 @@ class TcpRegistration(SelectorRegistration):
             self._send_queue.append(data)
             self.mark_writable(True, notify=True)
 
+    def enqueue_send_many(self, buffers: List[bytes]):
+        with self._lock:
+            logger.debug('[Reg %d] Enqueue new Writes (count %d)', self.reg_id, len(buffers))
+            self._send_queue.extend(buffers)
+            self.mark_writable(True, notify=True)
+
     def on_read(self):
         logger.debug('[Reg %d] On Read', self.reg_id)
         if not self._connected:
@@ -162,27 +170,36 @@ class TcpRegistration(SelectorRegistration):
     def _do_write(self):
         logger.info('[Reg %d] Flushing from Write Queue', self.reg_id)
 
-        write_count = 10  # to not over saturate on write
-        while len(self._send_queue) > 0 and write_count > 0:
-            write_count -= 1
-
-            data = self._send_queue.popleft()
-            try:
-                logger.debug('[Reg %d] Writing new data (len %d) to socket', self.reg_id, len(data))
-                self.resource.send(data)
-            except OSError as e:
-                if e.errno in (11, 115, 15):
-                    # operation not finished, re-add the data to send again
-                    self._send_queue.appendleft(data)
-                    break
-                else:
-                    # errored
-                    self._on_error(e)
-                    break
+        # everything queued goes out in a single syscall
+        buffers = list(itertools.islice(self._send_queue, self.MAX_WRITE_BUFFERS))
+        try:
+            logger.debug('[Reg %d] Writing new data (count %d) to socket', self.reg_id, len(buffers))
+            if hasattr(self.resource, 'sendmsg'):
+                sent = self.resource.sendmsg(buffers)
+            else:
+                sent = self.resource.send(b''.join(buffers))
+        except OSError as e:
+            if e.errno not in (11, 115, 15):
+                # errored
+                self._on_error(e)
+            # otherwise operation not finished, data stays queued to send again
+        else:
+            self._consume_sent(sent)
 
         if len(self._send_queue) < 1:
             self.mark_writable(False)
 
+    def _consume_sent(self, sent: int):
+        while sent > 0:
+            data = self._send_queue[0]
+            if sent < len(data):
+                # partial write, keep the rest for the next one
+                self._send_queue[0] = data[sent:]
+                break
+
+            self._send_queue.popleft()
+            sent -= len(data)
+
     def _finalize_connect(self):
         logger.info('[Reg %d] Finalizing Connection', self.reg_id)
 
@@ -334,7 +351,18 @@ class Selector(object):
         self._writable_lst: List = []
         self._exception_lst: List = []
         self._lock = threading.RLock()
-        self._eventfd = os.eventfd(0, os.EFD_NONBLOCK)
+        # wakes select up when registrations change. an eventfd sums all writes into one counter,
+        # so any number of wake ups is drained with a single read. not all platforms have it though.
+        if hasattr(os, 'eventfd'):
+            self._wakeup_socks = None
+            self._wakeup_fd = os.eventfd(0, os.EFD_NONBLOCK)
+        else:
+            self._wakeup_socks = socket.socketpair()
+            for skt in self._wakeup_socks:
+                skt.setblocking(False)
+            self._wakeup_fd = self._wakeup_socks[0].fileno()
+        # set while a wake up was signalled and not yet drained, further ones are redundant
+        self._wakeup_pending = False
         self._stop_run = False
 
     def register(self, registration: SelectorRegistration):
@@ -376,9 +404,9 @@ class Selector(object):
                 for res_id in readable:
                     if res_id in self._registered:
                         self._registered[res_id].on_read()
-                    elif res_id == self._eventfd:
+                    elif res_id == self._wakeup_fd:
                         logger.debug('[Selector] Run Event Signalled')
-                        os.eventfd_read(self._eventfd)
+                        self._drain_wakeup()
 
                 for res_id in writable:
                     if res_id in self._registered:
@@ -396,7 +424,7 @@ class Selector(object):
         self._writable_lst.clear()
         self._exception_lst.clear()
 
-        self._readable_lst.append(self._eventfd)
+        self._readable_lst.append(self._wakeup_fd)
 
         to_remove = []
 
@@ -424,8 +452,26 @@ class Selector(object):
             self._signal_run()
 
     def _signal_run(self):
+        if self._wakeup_pending:
+            return
+
         logger.debug('[Selector] Signalling Run')
-        os.eventfd_write(self._eventfd, 1)
+        self._wakeup_pending = True
+        if self._wakeup_socks is None:
+            os.eventfd_write(self._wakeup_fd, 1)
+        else:
+            self._wakeup_socks[1].send(b'\0')
+
+    def _drain_wakeup(self):
+        self._wakeup_pending = False
+        if self._wakeup_socks is None:
+            os.eventfd_read(self._wakeup_fd)
+        else:
+            try:
+                while self._wakeup_socks[0].recv(4096):
+                    pass
+            except BlockingIOError:
+                pass
 
 
 class SelectorThread(object):
@@ -439,6 +485,10 @@ class SelectorThread(object):
     def selector(self) -> Selector:
         return self._selector
 
-    def __del__(self):
+    def stop(self):
         self._selector.disable()
-        self._thread.join()
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def __del__(self):
+        self.stop()
@@ -1,6 +1,6 @@
 import socket
 import logging
-from typing import Optional, Callable, Tuple
+from typing import Optional, Callable, Tuple, List
 
 from .inet import InetAddress
 from .selector import Selector, TcpRegistration, TcpServerRegistration, UdpRegistration
@@ -25,7 +25,10 @@ class TcpSocket(ReadableStream[bytes], WritableStream[bytes]):
 
         self._socket.setblocking(False)
         self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        # small request/response messages, don't let nagle hold them back
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
         self._registration = TcpRegistration(self._socket, self._on_read, self._on_connect, self._on_error, self._on_closed,
                                              already_connected=skt is not None)
@@ -80,6 +83,11 @@ class TcpSocket(ReadableStream[bytes], WritableStream[bytes]):
         logger.info('[Socket, %d] [TCP-C] Writing data (len %d)', self._socket.fileno(), len(data))
         self._registration.enqueue_send(data)
 
+    def writev(self, buffers: List[bytes]):
+        assert self._state == self.STATE_CONNECTED, "cannot write until connected"
+        logger.info('[Socket, %d] [TCP-C] Writing data (count %d)', self._socket.fileno(), len(buffers))
+        self._registration.enqueue_send_many(buffers)
+
     def write_done(self):
         self.close()
 
@@ -121,7 +129,8 @@ class TcpServerSocket(object):
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
         self._socket.setblocking(False)
         self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
 
         self._registration = TcpServerRegistration(self._socket, self._on_connect, self._on_error)
         self._on_connect_callback = None
@@ -177,7 +186,8 @@ class UdpSocket(ReadableStream[Tuple[InetAddress, bytes]], WritableStream[Tuple[
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
         self._socket.setblocking(False)
         self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
 
         self._registration = UdpRegistration(self._socket, self._on_read, self._on_error, self._on_closed)
 
@@ -182,3 +182,4 @@ class Inactive(Transmit):
 
 
 ATTRIBUTES = [RtpMap, Fmtp, Rtcp, Ptime, MaxPtime, RecvOnly, SendRecv, SendOnly, Inactive]
+ATTRIBUTES_BY_NAME = {attribute.name: attribute for attribute in ATTRIBUTES}
@@ -6,7 +6,7 @@ from .sdp_types import (
     NetworkType, AddressType, MediaType, MediaProtocol,
     MEDIA_TYPE_BY_STR, MEDIA_PROTOCOL_BY_STR, ADDRESS_TYPE_BY_STR, NETWORK_TYPE_BY_STR
 )
-from .attributes import Attribute, ATTRIBUTES, CustomAttribute
+from .attributes import Attribute, ATTRIBUTES_BY_NAME, CustomAttribute
 from ..util import Field
 
 
@@ -172,16 +172,12 @@ class AttributeField(SdpField):
     def parse_from(self, value: str):
         value = value.split(':', 1)
 
-        self.attribute = None
-        for attr in ATTRIBUTES:
-            attr = attr()
-            if attr.name == value[0]:
-                if not attr.name_only:
-                    attr.parse_from(value[1])
-                self.attribute = attr
-                break
-
-        if self.attribute is None:
+        attr_cls = ATTRIBUTES_BY_NAME.get(value[0])
+        if attr_cls is not None:
+            self.attribute = attr_cls()
+            if not self.attribute.name_only:
+                self.attribute.parse_from(value[1])
+        else:
             if len(value) == 1:
                 self.attribute = CustomAttribute(value[0])
             else:
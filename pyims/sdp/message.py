@@ -15,12 +15,14 @@ class SdpMessage(object):
             self._fields = dict()
         elif isinstance(fields, list):
             self._fields = dict()
-            [self.add_field(field) for field in fields]
+            for field in fields:
+                self.add_field(field)
         else:
             self._fields = fields
 
         if attributes is not None:
-            [self.add_field(AttributeField(attr)) for attr in attributes]
+            for attr in attributes:
+                self.add_field(AttributeField(attr))
 
     def field(self, name: Union[str, T_FIELD]) -> T_FIELD:
         wanted_name = name if isinstance(name, str) else name.__NAME__
@@ -5,10 +5,10 @@ from .message import SdpMessage
 def parse_sdp(data: str) -> SdpMessage:
     props = dict()
     for line in data.split('\r\n'):
-        if '=' not in line:
+        key, sep, value = line.partition('=')
+        if not sep:
             continue
 
-        key, value = line.split('=', 1)
         if key in props:
             if isinstance(props[key], list):
                 props[key].append(value)
@@ -19,11 +19,10 @@ def parse_sdp(data: str) -> SdpMessage:
 
     fields = dict()
     for field_cls in FIELDS:
-        field = field_cls()
-        if field.name not in props:
+        if field_cls.name not in props:
             continue
 
-        values = props[field.name]
+        values = props[field_cls.name]
         if isinstance(values, list):
             parsed = []
             for v in values:
@@ -31,9 +30,9 @@ def parse_sdp(data: str) -> SdpMessage:
                 field.parse_from(v)
                 parsed.append(field)
         else:
-            field.parse_from(values)
-            parsed = field
+            parsed = field_cls()
+            parsed.parse_from(values)
 
-        fields[field.name] = parsed
+        fields[field_cls.name] = parsed
 
     return SdpMessage(fields)
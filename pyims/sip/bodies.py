@@ -59,6 +59,7 @@ class SdpBody(Body[SdpMessage]):
 
 
 BODIES = [SdpBody]
+BODIES_BY_CONTENT_TYPE = {body().content_type: body for body in BODIES}
 
 
 def wrap_body(data: Any, content_type: Optional[str] = None) -> Optional[Body]:
@@ -11,11 +11,67 @@ from .sip_types import (
 from ..util import Header
 
 
+# every group stops at the next ';', so matching is linear in the header length
+_VIA_RE = re.compile(r"(SIP/\d+\.\d+)/(\w+)\s+([^;\s]+)\s*((?:;[^;]*)*)$")
+_AUTH_PARAM_RE = re.compile(r'([^\s=,]+)=(?:"([^"]*)"|([^\s,]*))\s*(?:,\s*|$)')
+
+
 class SipHeader(Header, ABC):
-    pass
+    __slots__ = ('_raw',)
+
+    @classmethod
+    def lazy(cls, raw: Union[str, bytes]) -> 'SipHeader':
+        # creates the header without parsing it, parse_from runs when one of its attributes is first read.
+        # raw may be left undecoded, in which case it is only decoded (as utf-8) when parsed.
+        header = cls.__new__(cls)
+        header._raw = raw
+        return header
+
+    def __getattr__(self, item):
+        # only reached for attributes which are not set, i.e. before a lazy header was parsed.
+        # dunder probes (copy, pickle, ...) must not trigger parsing.
+        if item == '_raw' or (item.startswith('__') and item.endswith('__')) or not self._parse_pending():
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
+
+        return getattr(self, item)
+
+    def __setattr__(self, key, value):
+        # parse first, otherwise a later parse would overwrite what is written now
+        if key != '_raw':
+            self._parse_pending()
+        super().__setattr__(key, value)
+
+    def __getstate__(self):
+        # slots are read without going through __getattr__, so copying an unparsed header doesn't parse it
+        state = dict()
+        for cls in type(self).__mro__:
+            for slot in cls.__dict__.get('__slots__', ()):
+                try:
+                    state[slot] = object.__getattribute__(self, slot)
+                except AttributeError:
+                    pass
+        return None, state
+
+    def _parse_pending(self) -> bool:
+        try:
+            raw = object.__getattribute__(self, '_raw')
+        except AttributeError:
+            return False
+
+        # dropped while parsing so attribute access inside parse_from doesn't parse again
+        object.__delattr__(self, '_raw')
+        try:
+            self.parse_from(raw if isinstance(raw, str) else raw.decode('utf-8'))
+        except BaseException:
+            # still unparsed, the next access should fail the same way instead of on a missing attribute
+            object.__setattr__(self, '_raw', raw)
+            raise
+
+        return True
 
 
 class IdentityHeader(SipHeader, ABC):
+    __slots__ = ('value',)
 
     def __init__(self, value: Optional[str] = None):
         self.value: Optional[str] = value
@@ -28,6 +84,7 @@ class IdentityHeader(SipHeader, ABC):
 
 
 class IntHeader(SipHeader, ABC):
+    __slots__ = ('value',)
 
     def __init__(self, value: Optional[int] = None):
         self.value: Optional[int] = value
@@ -40,6 +97,7 @@ class IntHeader(SipHeader, ABC):
 
 
 class CustomHeader(IdentityHeader):
+    __slots__ = ('_name',)
 
     def __init__(self, name: str, value: str):
         super().__init__(value)
@@ -51,6 +109,7 @@ class CustomHeader(IdentityHeader):
 
 
 class SenderSendeeHeader(SipHeader, ABC):
+    __slots__ = ('visible_name', 'uri', 'tag')
 
     def __init__(self, visible_name: Optional[str] = None, uri: Optional[str] = None, tag: Optional[str] = None):
         self.visible_name: Optional[str] = visible_name
@@ -78,6 +137,7 @@ class SenderSendeeHeader(SipHeader, ABC):
 
 class Request(SipHeader):
     __NAME__ = 'Request'
+    __slots__ = ('method', 'uri', 'version')
 
     def __init__(self, method: Optional[Method] = None, uri: Optional[str] = None, version: Optional[Version] = None):
         self.method: Optional[Method] = method
@@ -85,12 +145,12 @@ class Request(SipHeader):
         self.version: Optional[Version] = version
 
     def parse_from(self, value: str):
-        value = value.split(" ")
-        assert len(value) == 3
-        self.method = Method[value[0]]
-        self.uri = value[1]
-        self.version = VERSIONS_BY_STR[value[2]]
-
+        method, _, rest = value.partition(' ')
+        uri, _, version = rest.partition(' ')
+        assert uri and version, f"Invalid request line: {value}"
+        self.method = Method[method]
+        self.uri = uri
+        self.version = VERSIONS_BY_STR[version]
 
     def compose(self) -> str:
         return f"{self.method.name} {self.uri} {self.version.value}"
@@ -98,16 +158,18 @@ class Request(SipHeader):
 
 class Response(SipHeader):
     __NAME__ = 'Response'
+    __slots__ = ('version', 'status')
 
     def __init__(self, version: Optional[Version] = None, status: Optional[Status] = None):
         self.version: Optional[Version] = version
         self.status: Optional[Status] = status
 
     def parse_from(self, value: str):
-        value = value.split(" ", 2)
-        assert len(value) == 3
-        self.version = VERSIONS_BY_STR[value[0]]
-        self.status = Status(STATUS_FROM_NUMBER[int(value[1])], value[2])
+        version, _, rest = value.partition(' ')
+        code, sep, description = rest.partition(' ')
+        assert sep, f"Invalid status line: {value}"
+        self.version = VERSIONS_BY_STR[version]
+        self.status = Status(STATUS_FROM_NUMBER[int(code)], description)
 
     def compose(self) -> str:
         return f"{self.version.value} {self.status.code.value[0]} {self.status.description}"
@@ -115,15 +177,16 @@ class Response(SipHeader):
 
 class CSeq(SipHeader):
     __NAME__ = 'CSeq'
+    __slots__ = ('method', 'sequence')
 
     def __init__(self, method: Optional[Method] = None, sequence: Optional[int] = None):
         self.method: Optional[Method] = method
         self.sequence: Optional[int] = sequence
 
     def parse_from(self, value: str):
-        value = value.split(" ")
-        self.sequence = int(value[0])
-        self.method = Method[value[1]]
+        sequence, _, method = value.partition(' ')
+        self.sequence = int(sequence)
+        self.method = Method[method]
 
     def compose(self) -> str:
         return f"{self.sequence} {self.method.name}"
@@ -131,18 +194,22 @@ class CSeq(SipHeader):
 
 class CallID(IdentityHeader):
     __NAME__ = 'Call-ID'
+    __slots__ = ()
 
 
 class From(SenderSendeeHeader):
     __NAME__ = 'From'
+    __slots__ = ()
 
 
 class To(SenderSendeeHeader):
     __NAME__ = 'To'
+    __slots__ = ()
 
 
 class ContentLength(IntHeader):
     __NAME__ = 'Content-Length'
+    __slots__ = ()
 
     def __init__(self, value: Optional[int] = None):
         super().__init__(value)
@@ -150,6 +217,7 @@ class ContentLength(IntHeader):
 
 class MaxForwards(IntHeader):
     __NAME__ = 'Max-Forwards'
+    __slots__ = ()
 
     def __init__(self, value: Optional[int] = None):
         super().__init__(value)
@@ -157,6 +225,7 @@ class MaxForwards(IntHeader):
 
 class Expires(IntHeader):
     __NAME__ = 'Expires'
+    __slots__ = ()
 
     def __init__(self, value: Optional[int] = None):
         super().__init__(value)
@@ -164,6 +233,7 @@ class Expires(IntHeader):
 
 class Contact(SipHeader):
     __NAME__ = 'Contact'
+    __slots__ = ('address', 'internal_tags', 'external_tags')
 
     def __init__(self, address: Optional[InetAddress] = None,
                  internal_tags: Optional[Dict[str, str]] = None,
@@ -205,20 +275,42 @@ class Contact(SipHeader):
 
 class Via(SipHeader):
     __NAME__ = 'Via'
+    __slots__ = ('version', 'transport', 'address', 'params')
 
     def __init__(self, version: Optional[Version] = None,
                  transport: Optional[str] = None,
                  address: Optional[Union[InetAddress, str]] = None,
                  rport: Optional[str] = None,
-                 branch: Optional[str] = None):
+                 branch: Optional[str] = None,
+                 params: Optional[Dict[str, Optional[str]]] = None):
         self.version: Optional[Version] = version
         self.transport: Optional[str] = transport
         self.address: Optional[InetAddress] = address
-        self.rport: Optional[str] = rport
-        self.branch: Optional[str] = branch
+        # all parameters in order, None for ones without a value (e.g. a bare rport)
+        self.params: Dict[str, Optional[str]] = dict(params) if params else dict()
+        if rport is not None:
+            self.rport = rport
+        if branch is not None:
+            self.branch = branch
+
+    @property
+    def rport(self) -> Optional[str]:
+        return self.params.get('rport')
+
+    @rport.setter
+    def rport(self, value: Optional[str]):
+        self._set_param('rport', value)
+
+    @property
+    def branch(self) -> Optional[str]:
+        return self.params.get('branch')
+
+    @branch.setter
+    def branch(self, value: Optional[str]):
+        self._set_param('branch', value)
 
     def parse_from(self, value: str):
-        match = re.search(r"^(SIP/\d+\.\d+)/(\w+)\s(.+)(?:;rport=(.+))?(?:;branch=(.+))?$", value)
+        match = _VIA_RE.match(value)
         assert match is not None, f"Invalid '{self.name}' header: {value}"
         self.version = VERSIONS_BY_STR[match.group(1)]
         self.transport = match.group(2)
@@ -226,20 +318,30 @@ class Via(SipHeader):
             self.address = InetAddress(*(match.group(3).split(':', 1)))
         else:
             self.address = match.group(3)
-        self.rport = match.group(4)
-        self.branch = match.group(5)
+
+        self.params = dict()
+        for param in match.group(4).split(';')[1:]:
+            key, has_value, param_value = param.partition('=')
+            key = key.strip()
+            if key:
+                self.params[key] = param_value.strip() if has_value else None
 
     def compose(self) -> str:
         res = f"{self.version.value}/{self.transport} {self.address}"
-        if self.rport:
-            res += f";rport={self.rport}"
-        if self.branch:
-            res += f";branch={self.branch}"
+        for key, param_value in self.params.items():
+            res += f";{key}" if param_value is None else f";{key}={param_value}"
         return res
 
+    def _set_param(self, key: str, value: Optional[str]):
+        if value is None:
+            self.params.pop(key, None)
+        else:
+            self.params[key] = value
+
 
 class RecordRoute(SipHeader):
     __NAME__ = 'Record-Route'
+    __slots__ = ('user_info', 'host_ip', 'params')
 
     def __init__(self,
                  user_info: Optional[str] = None,
@@ -275,6 +377,7 @@ class RecordRoute(SipHeader):
 
 class Authorization(SipHeader):
     __NAME__ = 'Authorization'
+    __slots__ = ('scheme', 'username', 'uri', 'realm', 'algorithm', 'qop', 'nc', 'cnonce', 'nonce', 'response', 'additional_values')
 
     def __init__(self,
                  scheme: Optional[AuthenticationScheme] = None,
@@ -304,8 +407,7 @@ class Authorization(SipHeader):
         value = value.split(' ', 1)
         self.scheme = AUTH_SCHEME_BY_STR[value[0]]
 
-        values = [line.strip().split('=', 1) for line in value[1].split(', ')]
-        values = {k: v.strip('"') for k, v in values}
+        values = {k: quoted or unquoted for k, quoted, unquoted in _AUTH_PARAM_RE.findall(value[1])}
 
         self.username = values.pop('username')
         self.uri = values.pop('uri')
@@ -349,6 +451,7 @@ class Authorization(SipHeader):
 
 class WWWAuthenticate(SipHeader):
     __NAME__ = 'WWW-Authenticate'
+    __slots__ = ('scheme', 'nonce', 'realm', 'algorithm', 'qop', 'additional_values')
 
     def __init__(self, scheme: Optional[AuthenticationScheme] = None,
                  nonce: Optional[str] = None, realm: Optional[str] = None,
@@ -365,8 +468,7 @@ class WWWAuthenticate(SipHeader):
         value = value.split(' ', 1)
         self.scheme = AUTH_SCHEME_BY_STR[value[0]]
 
-        values = [line.strip().split('=', 1) for line in value[1].split(', ')]
-        values = {k: v.strip('"') for k, v in values}
+        values = {k: quoted or unquoted for k, quoted, unquoted in _AUTH_PARAM_RE.findall(value[1])}
 
         self.nonce = values.pop('nonce')
         self.realm = values.pop('realm')
@@ -392,3 +494,4 @@ class WWWAuthenticate(SipHeader):
 
 
 HEADERS = [CSeq, CallID, From, To, Contact, ContentLength, MaxForwards, Expires, Via, RecordRoute, Authorization, WWWAuthenticate]
+HEADERS_BY_NAME = {header.name: header for header in HEADERS}
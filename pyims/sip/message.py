@@ -33,6 +33,7 @@ class Body(ABC, Generic[T]):
 
 
 class Message(ABC):
+    __slots__ = ('_version', '_headers', '_body')
     T_HEADER = TypeVar('T_HEADER', bound=Type[SipHeader])
     T_BODY = TypeVar('T_BODY', bound=Type[Body])
 
@@ -45,7 +46,8 @@ class Message(ABC):
         self._headers = dict()
         self._body = body
 
-        [self.add_header(header) for header in headers]
+        for header in headers:
+            self.add_header(header)
 
     @property
     def version(self) -> Version:
@@ -93,6 +95,10 @@ class Message(ABC):
     def type(self) -> MessageType:
         pass
 
+    @abstractmethod
+    def _top_header(self) -> SipHeader:
+        pass
+
     def compose(self) -> str:
         headers = list()
         for header_lst in self._headers.values():
@@ -110,12 +116,13 @@ class Message(ABC):
         else:
             headers.append(ContentLength(0))
 
-        res = ''
-        if len(headers) > 0:
-            res += '\r\n'.join([f"{header.name}: {header.compose()}" for header in headers])
-        res += '\r\n\r\n' + body_str + '\r\n'
+        parts = [self._top_header().compose(), '\r\n']
+        parts.extend(header.name + ': ' + header.compose() + '\r\n' for header in headers)
+        parts.append('\r\n')
+        parts.append(body_str)
+        parts.append('\r\n')
 
-        return res
+        return ''.join(parts)
 
     def __str__(self):
         return self.compose()
@@ -125,6 +132,7 @@ class Message(ABC):
 
 
 class RequestMessage(Message):
+    __slots__ = ('_method', '_server_uri')
 
     def __init__(self, version: Version, method: Method, server_uri: str,
                  headers: List[SipHeader] = None,
@@ -141,16 +149,17 @@ class RequestMessage(Message):
     def type(self) -> MessageType:
         return MessageType.REQUEST
 
-    def compose(self) -> str:
+    def _top_header(self) -> SipHeader:
         request_header = Request()
         request_header.version = self.version
         request_header.method = self._method
         request_header.uri = self._server_uri
 
-        return request_header.compose() + '\r\n' + super().compose()
+        return request_header
 
 
 class ResponseMessage(Message):
+    __slots__ = ('_status',)
 
     def __init__(self, version: Version, status: Union[StatusCode, Status],
                  headers: List[SipHeader] = None,
@@ -166,9 +175,9 @@ class ResponseMessage(Message):
     def type(self) -> MessageType:
         return MessageType.RESPONSE
 
-    def compose(self) -> str:
-        request_header = Response()
-        request_header.version = self.version
-        request_header.status = self._status
+    def _top_header(self) -> SipHeader:
+        response_header = Response()
+        response_header.version = self.version
+        response_header.status = self._status
 
-        return request_header.compose() + '\r\n' + super().compose()
+        return response_header
@@ -1,73 +1,127 @@
-from typing import Dict, List, Optional, Tuple
+import re
+from typing import Dict, List, Optional, Tuple, Union, Iterator
 
-from .headers import HEADERS, Request, Header, CustomHeader
+from .headers import HEADERS_BY_NAME, Request, CustomHeader, Via, From, To, CSeq, CallID, ContentLength
 from .sip_types import MessageType, METHODS, VERSIONS_BY_STR
 from .headers import Response
 from .message import RequestMessage, ResponseMessage, Message, Body
-from .bodies import BODIES, CustomBody
-
-
-def _read_headers(data: str):
-    lines = data.split("\r\n")
-
+from .bodies import BODIES_BY_CONTENT_TYPE, CustomBody
+
+
+# header names are case-insensitive. keyed by the lowercased name as raw bytes, so names read
+# off the wire are matched without being decoded.
+_HEADERS_BY_LOWER_NAME: Dict[bytes, type] = {name.lower().encode('ascii'): header for name, header in HEADERS_BY_NAME.items()}
+# headers almost every message handler reads, all others are only parsed once accessed
+_EAGER_HEADERS = frozenset((Via, From, To, CSeq, CallID, ContentLength))
+# finds Content-Length (or its compact form) in a raw header block without decoding it
+_CONTENT_LENGTH_RE = re.compile(rb'^(?:content-length|l)[ \t]*:[ \t]*(\d+)[ \t]*\r?$', re.IGNORECASE | re.MULTILINE)
+# compact header forms (RFC 3261 section 7.3.3 and extensions) mapped to their full names
+_COMPACT_HEADER_NAMES: Dict[bytes, bytes] = {
+    b'a': b'Accept-Contact',
+    b'b': b'Referred-By',
+    b'c': b'Content-Type',
+    b'd': b'Request-Disposition',
+    b'e': b'Content-Encoding',
+    b'f': b'From',
+    b'i': b'Call-ID',
+    b'j': b'Reject-Contact',
+    b'k': b'Supported',
+    b'l': b'Content-Length',
+    b'm': b'Contact',
+    b'n': b'Identity-Info',
+    b'o': b'Event',
+    b'r': b'Refer-To',
+    b's': b'Subject',
+    b't': b'To',
+    b'u': b'Allow-Events',
+    b'v': b'Via',
+    b'x': b'Session-Expires',
+    b'y': b'Identity',
+}
+
+
+def _iter_header_lines(data: bytes, start: int, end: int) -> Iterator[Tuple[bytes, bytes]]:
+    pos = start
+    while pos < end:
+        line_end = data.find(b"\r\n", pos, end)
+        if line_end < 0:
+            line_end = end
+
+        if pos != line_end:
+            colon = data.find(b":", pos, line_end)
+            if colon >= 0:
+                # the line starts at the name, so only its end can carry whitespace
+                yield data[pos:colon].rstrip(), data[colon + 1:line_end].strip()
+
+        pos = line_end + 2
+
+
+def _read_headers(data: bytes, start: int, end: int):
+    top_end = data.find(b"\r\n", start, end)
+    if top_end < 0:
+        top_end = end
+
+    # header names are case-insensitive, so headers are keyed by the lowercased name only.
+    # the name as first seen on the wire is kept alongside for headers we don't know.
+    # names and values are kept as bytes, most of them are only decoded if ever needed.
     headers = dict()
-    for line in lines[1:]:
-        if len(line.strip()) < 1:
-            continue
-
-        key, value = line.split(":", 1)
-        key = key.strip()
-        value = value.strip()
-        if key in headers:
-            headers[key].append(value)
+    get_full_name = _COMPACT_HEADER_NAMES.get
+    for key, value in _iter_header_lines(data, top_end + 2, end):
+        # slices of a bytearray are bytearrays, which can't be used as keys
+        lower_key = bytes(key.lower())
+        full_key = get_full_name(lower_key)
+        if full_key is not None:
+            key = full_key
+            lower_key = full_key.lower()
+
+        if lower_key in headers:
+            headers[lower_key][1].append(value)
         else:
-            headers[key] = [value]
+            headers[lower_key] = (key, [value])
 
-    return lines[0], headers
+    return data[start:top_end].decode('utf-8'), headers
 
 
-def _get_body_length(headers: List[Header]) -> int:
-    length_headers = [header for header in headers if header.name == 'Content-Length']
-    if len(length_headers) < 1:
-        return 0
-
-    # noinspection PyUnresolvedReferences
-    return length_headers[0].value
-
-
-def _get_content_type(headers: List[Header]) -> Optional[str]:
-    headers = [header for header in headers if header.name == 'Content-Type']
-    if len(headers) < 1:
-        return None
-
-    # noinspection PyUnresolvedReferences
-    return headers[0].value
-
-
-def _parse_header(top_header: str, headers: Dict[str, List[str]]):
+def _parse_header(top_header: str, headers: Dict[bytes, Tuple[bytes, List[bytes]]]):
     parsed_headers = list()
     message_type = None
     type_header = None
-
-    for header_cls in HEADERS:
-        header = header_cls()
-        if header.name not in headers:
+    body_len = 0
+    content_type = None
+
+    # hot loop, runs per header of every message; keep lookups local
+    get_header_cls = _HEADERS_BY_LOWER_NAME.get
+    add_header = parsed_headers.append
+    for lower_name, (name, values) in headers.items():
+        if lower_name == b'content-length':
+            body_len = int(values[0])
+        elif lower_name == b'content-type':
+            content_type = values[0].decode('utf-8')
+
+        header_cls = get_header_cls(lower_name)
+        if header_cls is None:
+            name = name.decode('ascii')
+            parsed_headers.extend(CustomHeader(name, value.decode('utf-8')) for value in values)
             continue
 
-        for value in headers[header.name]:
-            header = header_cls()
-            header.parse_from(value)
-            parsed_headers.append(header)
+        if header_cls in _EAGER_HEADERS:
+            for value in values:
+                header = header_cls()
+                header.parse_from(value.decode('utf-8'))
+                add_header(header)
+        else:
+            for value in values:
+                add_header(header_cls.lazy(value))
 
-    type_line = top_header.split(" ")
-    if type_line[0] in METHODS:
+    first_token, _, _ = top_header.partition(' ')
+    if first_token in METHODS:
         # this is a request
         request = Request()
         request.parse_from(top_header)
 
         message_type = MessageType.REQUEST
         type_header = request
-    elif type_line[0] in VERSIONS_BY_STR.keys():
+    elif first_token in VERSIONS_BY_STR:
         # this is a response
         response = Response()
         response.parse_from(top_header)
@@ -78,43 +132,41 @@ def _parse_header(top_header: str, headers: Dict[str, List[str]]):
         # what?
         raise AssertionError('message type could not be determined')
 
-    return message_type, type_header, parsed_headers
+    return message_type, type_header, parsed_headers, body_len, content_type
 
 
-def parse_body(body_str: str, body_len: int, content_type: Optional[str]) -> Optional[Body]:
+def parse_body(body: Union[str, bytes, memoryview], body_len: int, content_type: Optional[str]) -> Optional[Body]:
     if body_len < 1:
         return None
 
+    # decoding straight from the buffer avoids copying the raw body out first
+    body_str = body if isinstance(body, str) else str(body, 'utf-8')
+
     if content_type is None:
         return CustomBody(body_str)
 
-    for body_cls in BODIES:
-        body_cls = body_cls()
-        if body_cls.content_type == content_type:
-            body_cls.parse_from(body_str)
-            return body_cls
+    body_cls = BODIES_BY_CONTENT_TYPE.get(content_type)
+    if body_cls is None:
+        return CustomBody(body_str, content_type)
 
-    return CustomBody(body_str, content_type)
+    body = body_cls()
+    body.parse_from(body_str)
+    return body
 
 
-def parse(data: str, start_idx: int = 0) -> Tuple[Message, int]:
-    headers_end = data.find("\r\n\r\n", start_idx)
+def parse(data: Union[bytes, bytearray], start_idx: int = 0) -> Tuple[Message, int]:
+    headers_end = data.find(b"\r\n\r\n", start_idx)
     if headers_end < 0:
         headers_end = len(data)
 
-    top_header, raw_headers = _read_headers(data[start_idx:headers_end])
-    message_type, type_header, parsed_headers = _parse_header(top_header, raw_headers)
+    top_header, raw_headers = _read_headers(data, start_idx, headers_end)
+    message_type, type_header, parsed_headers, body_len, content_type = _parse_header(top_header, raw_headers)
 
-    body_len = _get_body_length(parsed_headers)
-    body = data[start_idx+headers_end+1:start_idx+headers_end+1+body_len] if body_len > 1 else ''
+    body_start = headers_end + len(b'\r\n\r\n')
+    with memoryview(data) as view:
+        body = parse_body(view[body_start:body_start + body_len], body_len, content_type)
 
-    for name, values in raw_headers.items():
-        if not any([header for header in parsed_headers if name == header.name]):
-            parsed_headers.extend([CustomHeader(name, value) for value in values])
-
-    body = parse_body(body, body_len, _get_content_type(parsed_headers))
-
-    total_size = headers_end - start_idx + len('\r\n\r\n') + body_len
+    total_size = body_start - start_idx + body_len
 
     if message_type == MessageType.REQUEST:
         return RequestMessage(type_header.version, type_header.method, type_header.uri, headers=parsed_headers, body=body), total_size
@@ -122,3 +174,65 @@ def parse(data: str, start_idx: int = 0) -> Tuple[Message, int]:
         return ResponseMessage(type_header.version, type_header.status, headers=parsed_headers, body=body), total_size
     else:
         raise AssertionError('message type could not be determined')
+
+
+def _read_body_length(data: bytes, start: int, end: int) -> int:
+    match = _CONTENT_LENGTH_RE.search(data, start, end)
+    return int(match.group(1)) if match is not None else 0
+
+
+# splits a byte stream (e.g. a TCP connection) into SIP messages as data arrives.
+# bytes already known not to hold the end of the headers are not scanned again.
+class SipFramer(object):
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scan_pos = 0
+        # end of the pending message once its headers are complete, None while still waiting for headers
+        self._body_end: Optional[int] = None
+
+    def feed(self, data: bytes) -> List[Message]:
+        buffer = self._buffer
+        buffer += data
+
+        # runs once per message, keep lookups local
+        messages = []
+        add_message = messages.append
+        start = 0
+        while True:
+            if self._body_end is None:
+                # CRLFs before a start line (e.g. RFC 5626 keep-alives) are ignored, RFC 3261 section 7.5
+                while buffer.startswith(b"\r\n", start):
+                    start += 2
+                self._scan_pos = max(start, self._scan_pos)
+
+                headers_end = buffer.find(b"\r\n\r\n", self._scan_pos)
+                if headers_end < 0:
+                    # the delimiter may straddle this chunk and the next one
+                    self._scan_pos = max(start, len(buffer) - 3)
+                    break
+
+                self._body_end = headers_end + len(b'\r\n\r\n') + _read_body_length(buffer, start, headers_end)
+
+            if len(buffer) < self._body_end:
+                # headers are known, don't look at anything until the whole body is in
+                break
+
+            message, size = parse(buffer, start)
+            add_message(message)
+            start += size
+            self._scan_pos = start
+            self._body_end = None
+
+        if start > 0:
+            del buffer[:start]
+            self._scan_pos -= start
+            if self._body_end is not None:
+                self._body_end -= start
+
+        return messages
+
+    def reset(self):
+        self._buffer.clear()
+        self._scan_pos = 0
+        self._body_end = None
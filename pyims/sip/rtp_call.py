@@ -1,4 +1,3 @@
-import io
 from collections import deque
 from typing import Optional, Callable
 
@@ -14,7 +13,9 @@ class CallOutStream(ReadableStream[bytes]):
     def __init__(self):
         self._is_reading = False
         self._callback = None
+        # streams and their finish callbacks, always pushed/popped together
         self._streams = deque()
+        self._stream_callbacks = deque()
         self._current_stream = None
         self._current_stream_callback = None
 
@@ -26,7 +27,8 @@ class CallOutStream(ReadableStream[bytes]):
             self._start_read_next()
 
     def attach_stream(self, stream: ReadableStream[bytes], on_finish: Optional[Callable[[], None]] = None):
-        self._streams.append((stream, on_finish))
+        self._streams.append(stream)
+        self._stream_callbacks.append(on_finish)
 
         if self._is_reading and self._current_stream is None:
             self._start_read_next()
@@ -41,7 +43,8 @@ class CallOutStream(ReadableStream[bytes]):
             self._callback(None)
             return
 
-        stream, callback = self._streams.popleft()
+        stream = self._streams.popleft()
+        callback = self._stream_callbacks.popleft()
         stream.start_read(self._on_read)
         self._current_stream = stream
         self._current_stream_callback = callback
@@ -56,14 +59,14 @@ class CallOutStream(ReadableStream[bytes]):
 class CallInStream(WritableStream[bytes]):
 
     def __init__(self):
-        self._buffer = io.BytesIO()
+        self._buffer = bytearray()
         self._stream = None
 
     def write(self, data: bytes):
         if self._stream is not None:
             self._stream.write(data)
         else:
-            self._buffer.write(data)
+            self._buffer.extend(data)
 
     def write_done(self):
         if self._stream is not None:
@@ -72,9 +75,9 @@ class CallInStream(WritableStream[bytes]):
     def attach(self, stream: WritableStream[bytes]):
         self._stream = stream
 
-        data = self._buffer.read()
-        if data is not None:
-            self._stream.write(data)
+        if self._buffer:
+            self._stream.write(bytes(self._buffer))
+            self._buffer.clear()
 
 
 class RtpCallSession(CallSession):
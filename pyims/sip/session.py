@@ -1,5 +1,6 @@
+import itertools
 import logging
-import random
+import secrets
 from contextlib import contextmanager
 from typing import List, Optional, Union, Tuple, Callable, Any
 
@@ -26,10 +27,16 @@ class SipSession(object):
         self._server_endpoint = server_endpoint
         self._username = user.username
         self._server_host = user.host
+        self._from_uri = f"sip:{user.username}@{user.host}"
+        self._default_target_uri = f"sip:{user.host}"
+        self._self_target_uri = f"sip:{user.username}@{user.host}:{local_address.ip}"
         self._default_headers = default_headers if default_headers is not None else list()
         self._transaction: Optional[Transaction] = None
         self._in_transaction: bool = False
         self._listeners = []
+        # branches must be unique per transaction, a random per-session prefix keeps them unique across sessions
+        self._branch_prefix = secrets.token_hex(4)
+        self._branch_counter = itertools.count(1)
 
     def listen(self, method_or_methods: Union[Method, List[Method]], callback: Callable[[Transaction, RequestMessage], None]):
         methods = method_or_methods if isinstance(method_or_methods, list) else [method_or_methods]
@@ -67,9 +74,9 @@ class SipSession(object):
                 assert to is not None
                 target_uri = f"sip:{to.username}@{to.host}"
             elif include_self_in_target_uri:
-                target_uri = f"sip:{self._username}@{self._server_host}:{self._local_address.ip}"
+                target_uri = self._self_target_uri
             else:
-                target_uri = f"sip:{self._server_host}"
+                target_uri = self._default_target_uri
         if additional_headers is None:
             additional_headers = list()
 
@@ -79,8 +86,7 @@ class SipSession(object):
         request.add_header(Expires(expires), override=True)
 
         tag = tag or self.generate_tag()
-        from_uri = f"sip:{self._username}@{self._server_host}"
-        request.add_header(From(uri=from_uri, tag=tag), override=True)
+        request.add_header(From(uri=self._from_uri, tag=tag), override=True)
 
         call_id = call_id or self.generate_callid()
         request.add_header(CallID(f"{call_id}@{self._local_address.ip}"), override=True)
@@ -88,7 +94,7 @@ class SipSession(object):
         branch = branch or self.generate_branch(method)
         request.add_header(Via(Version.VERSION_2, self._transport.name, self._local_address, branch=branch), override=False)
 
-        to_uri = f"sip:{to.username}@{to.host}" if to is not None else from_uri
+        to_uri = f"sip:{to.username}@{to.host}" if to is not None else self._from_uri
         request.add_header(To(uri=to_uri), override=True)
 
         for header in self._default_headers:
@@ -131,7 +137,8 @@ class SipSession(object):
 
     @contextmanager
     def _request(self, request: RequestMessage):
-        logger.info('Sending request: \n%s', request.compose())
+        # the message is only composed (through __str__) if the record is actually emitted
+        logger.info('Sending request: \n%s', request)
 
         if self._transaction is None:
             self._transaction = self._transport.open(
@@ -147,7 +154,7 @@ class SipSession(object):
         self._in_transaction = False
 
     def _respond(self, response: ResponseMessage):
-        logger.info('Sending response: \n', response.compose())
+        logger.info('Sending response: \n%s', response)
 
         if self._transaction is None:
             self._transaction = self._transport.open(
@@ -181,12 +188,12 @@ class SipSession(object):
 
     @staticmethod
     def generate_callid() -> str:
-        return f"call-aa11-{random.randint(100, 5000)}"
+        return f"call-aa11-{secrets.token_hex(4)}"
 
     @staticmethod
     def generate_tag() -> str:
-        return f"aq111aw-{random.randint(100, 5000)}"
+        return f"aq111aw-{secrets.token_hex(4)}"
 
-    @staticmethod
-    def generate_branch(method: Optional[Method] = None) -> str:
-        return f"pyimsbranch-{random.randint(100, 5000)}-{method.name.lower() if method else 'any'}"
+    def generate_branch(self, method: Optional[Method] = None) -> str:
+        # z9hG4bK magic cookie required by RFC 3261 section 8.1.1.7
+        return f"z9hG4bK-pyims-{self._branch_prefix}-{next(self._branch_counter):x}-{method.name.lower() if method else 'any'}"
@@ -119,7 +119,7 @@ class AuthenticationAlgorithm(enum.Enum):
 Status = namedtuple('Status', 'code,description')
 User = namedtuple('User', 'username,host')
 
-METHODS = [method.name for method in list(Method)]
+METHODS = frozenset(method.name for method in list(Method))
 VERSIONS_BY_STR = {version.value: version for version in list(Version)}
 STATUS_FROM_NUMBER = {status.value[0]: status for status in list(StatusCode)}
 AUTH_SCHEME_BY_STR = {scheme.value: scheme for scheme in list(AuthenticationScheme)}
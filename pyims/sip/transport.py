@@ -1,13 +1,14 @@
-import io
 import logging
+import queue
 import threading
 from abc import ABC, abstractmethod
 from collections import deque
 from typing import Optional, Callable, Tuple, List
 
 from .message import Message
-from .parser import parse
-from ..nio.selector import Selector, SelectorThread
+from .parser import SipFramer, parse
+from ..nio import get_default_selector
+from ..nio.selector import Selector
 from ..nio.sockets import InetAddress, TcpSocket, UdpSocket
 
 logger = logging.getLogger('pyims.sip.transport')
@@ -18,10 +19,11 @@ class Transaction(ABC):
     def __init__(self,
                  on_new_messages: Optional[Callable[[], None]] = None,
                  on_error: Optional[Callable[[Exception], None]] = None):
-        self._lock = threading.RLock()
-        self._read_event = threading.Event()
-        self._read_buff = io.BytesIO()
-        self._in_message_queue: deque[Message] = deque()
+        # guards the framer and connection state only, the message queue is thread-safe on its own
+        self._lock = threading.Lock()
+        self._framer = SipFramer()
+        # holds received messages, or None to wake up waiters on error
+        self._in_message_queue: queue.SimpleQueue[Optional[Message]] = queue.SimpleQueue()
         self._on_new_messages_callback = on_new_messages
         self._on_error_callback = on_error
         self._errored = False
@@ -31,20 +33,19 @@ class Transaction(ABC):
         pass
 
     def await_message(self, timeout: float = 5) -> Optional[Message]:
-        with self._lock:
-            self._throw_if_errored()
+        self._throw_if_errored()
 
-            if len(self._in_message_queue) > 0:
-                return self._in_message_queue.popleft()
+        try:
+            message = self._in_message_queue.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError() from None
 
-        if self._read_event.wait(timeout):
-            self._read_event.clear()
+        if message is None:
+            # pass the wake up on to any other waiter
+            self._in_message_queue.put(None)
+            self._throw_if_errored()
 
-            with self._lock:
-                self._throw_if_errored()
-                return self._in_message_queue.popleft()
-        else:
-            raise TimeoutError()
+        return message
 
     @abstractmethod
     def close(self):
@@ -55,33 +56,23 @@ class Transaction(ABC):
             # TODO: END OF STREAM
             return
 
-        read_callback = None
-        has_new_messages = False
         with self._lock:
             if self._errored:
                 return
 
-            self._read_buff.write(data)
-
-            self._read_buff.seek(0, io.SEEK_SET)
-            data = self._read_buff.getvalue()
-            new_pos, messages = self._parse_messages(data)
-            self._in_message_queue.extend(messages)
+            messages = self._framer.feed(data)
 
-            data = data[new_pos:]
-            self._read_buff.write(data)
-            self._read_buff.truncate(len(data))
+        if len(messages) > 0:
+            self._deliver_messages(messages)
 
-            if len(messages) > 0:
-                has_new_messages = True
-                read_callback = self._on_new_messages_callback
+    def _deliver_messages(self, messages: List[Message]):
+        for message in messages:
+            self._in_message_queue.put(message)
 
-        if has_new_messages:
-            logger.info('[SIP] Notifying new messages')
-            self._read_event.set()
-
-            if read_callback is not None:
-                read_callback()
+        logger.info('[SIP] Notifying new messages')
+        read_callback = self._on_new_messages_callback
+        if read_callback is not None:
+            read_callback()
 
     def _on_error(self, ex: Exception):
         callback = None
@@ -89,34 +80,22 @@ class Transaction(ABC):
             self._errored = True
             callback = self._on_error_callback
 
-        self._read_event.set()
+        self._in_message_queue.put(None)
 
         if callback:
             callback(ex)
 
+    def _drain_in_messages(self):
+        try:
+            while True:
+                self._in_message_queue.get_nowait()
+        except queue.Empty:
+            pass
+
     def _throw_if_errored(self):
         if self._errored:
             raise EnvironmentError('transaction failure')
 
-    @staticmethod
-    def _parse_messages(data: bytes) -> Tuple[int, List[Message]]:
-        data = data.decode('utf-8')
-
-        messages = []
-        start = 0
-
-        while start < len(data):
-            end_of_headers = data.find('\r\n\r\n', start)
-            if end_of_headers < 0:
-                break
-
-            message, size = parse(data, start)
-            messages.append(message)
-
-            start += size
-
-        return start, messages
-
 
 class Transport(ABC):
 
@@ -144,6 +123,8 @@ class Transport(ABC):
 
 
 class TcpTransaction(Transaction):
+    # bound on what may be queued while connecting, so sending can't grow it without limit
+    OUT_QUEUE_HIGH_WATERMARK = 1 << 20
 
     def __init__(self,
                  selector: Selector,
@@ -154,23 +135,36 @@ class TcpTransaction(Transaction):
         super().__init__(on_new_messages, on_error)
         self._socket: Optional[TcpSocket] = None
         self._is_connected: bool = False
-        self._out_message_queue: deque[Message] = deque()
+        # messages sent before the connection completes, already encoded
+        self._out_message_queue: deque[bytes] = deque()
+        self._out_bytes_pending: int = 0
 
         self._start_open_and_connect(selector, local_address, remote_address)
 
     def send(self, message: Message):
+        # composed once, for both the log and the write
+        composed = message.compose()
+        data = composed.encode("utf-8")
         with self._lock:
             self._throw_if_errored()
 
-            logger.debug('[SIP] [TCP-C] User sending new message %s', message.compose())
+            logger.debug('[SIP] [TCP-C] User sending new message %s', composed)
 
-            if self._socket is None:
+            skt = self._socket
+            if skt is None:
                 return
 
             if not self._is_connected:
-                self._out_message_queue.append(message)
-            else:
-                self._socket.write(message.compose().encode("utf-8"))
+                if self._out_bytes_pending + len(data) > self.OUT_QUEUE_HIGH_WATERMARK:
+                    raise BlockingIOError('SIP TCP send buffer full')
+
+                self._out_message_queue.append(data)
+                self._out_bytes_pending += len(data)
+                return
+
+        # the socket write takes the selector lock, which the selector thread holds while
+        # calling into us. writing while holding our own lock could deadlock with it.
+        skt.write(data)
 
     def close(self):
         with self._lock:
@@ -200,22 +194,27 @@ class TcpTransaction(Transaction):
             logger.info('[SIP] [TCP-C] Socket finished connect')
 
             self._is_connected = True
-            self._read_buff.truncate()
-            self._in_message_queue.clear()
+            self._framer.reset()
+            self._drain_in_messages()
             self._socket.start_read(self._on_read)
             self._flush_write_queue()
 
     def _flush_write_queue(self):
-        while len(self._out_message_queue) > 0:
-            message = self._out_message_queue.popleft()
-            self._socket.write(message.compose().encode('utf-8'))
+        if len(self._out_message_queue) < 1:
+            return
+
+        buffers = list(self._out_message_queue)
+        self._out_message_queue.clear()
+        self._out_bytes_pending = 0
+        self._socket.writev(buffers)
 
 
 class TcpTransport(Transport):
 
     def __init__(self, ):
         super().__init__()
-        self._selector_thread = SelectorThread()
+        # all transports run on the one process-wide selector thread
+        self._selector = get_default_selector()
 
     @property
     def name(self) -> str:
@@ -223,17 +222,18 @@ class TcpTransport(Transport):
 
     @property
     def selector(self) -> Selector:
-        return self._selector_thread.selector
+        return self._selector
 
     def open(self,
              local_address: InetAddress,
              remote_address: InetAddress,
              on_new_messages: Callable[[], None],
              on_error: Callable[[Exception], None]) -> Transaction:
-        return TcpTransaction(self._selector_thread.selector, local_address, remote_address, on_new_messages, on_error)
+        return TcpTransaction(self._selector, local_address, remote_address, on_new_messages, on_error)
 
     def close(self):
-        del self._selector_thread
+        # the selector is shared, so it is left running for other users
+        self._selector = None
 
 
 class UdpTransaction(Transaction):
@@ -252,15 +252,17 @@ class UdpTransaction(Transaction):
         self._socket.start_read(self._on_read_custom)
 
     def send(self, message: Message):
+        composed = message.compose()
         with self._lock:
             self._throw_if_errored()
 
-            logger.debug('[SIP] [UDP] User sending new message %s', message.compose())
+            logger.debug('[SIP] [UDP] User sending new message %s', composed)
 
-            if self._socket is None:
+            skt = self._socket
+            if skt is None:
                 return
 
-            self._socket.write((self._remote_address, message.compose().encode("utf-8")))
+        skt.write((self._remote_address, composed.encode("utf-8")))
 
     def close(self):
         with self._lock:
@@ -269,14 +271,31 @@ class UdpTransaction(Transaction):
                 self._socket = None
 
     def _on_read_custom(self, data: Optional[Tuple[InetAddress, bytes]]):
-        self._on_read(data[1] if data is not None else None)
+        if data is None:
+            # TODO: END OF STREAM
+            return
+
+        if self._errored:
+            return
+
+        # a datagram always holds exactly one whole message, no need to go through the framer
+        try:
+            message, _ = parse(data[1])
+        except Exception:
+            # malformed datagrams (keep-alives, truncated packets) are discarded, RFC 3261 section 18.3
+            logger.warning('[SIP] [UDP] Discarding malformed datagram from %s (len %d)', data[0], len(data[1]),
+                           exc_info=True)
+            return
+
+        self._deliver_messages([message])
 
 
 class UdpTransport(Transport):
 
     def __init__(self, ):
         super().__init__()
-        self._selector_thread = SelectorThread()
+        # all transports run on the one process-wide selector thread
+        self._selector = get_default_selector()
 
     @property
     def name(self) -> str:
@@ -284,14 +303,15 @@ class UdpTransport(Transport):
 
     @property
     def selector(self) -> Selector:
-        return self._selector_thread.selector
+        return self._selector
 
     def open(self,
              local_address: InetAddress,
              remote_address: InetAddress,
              on_new_messages: Callable[[], None],
              on_error: Callable[[Exception], None]) -> Transaction:
-        return UdpTransaction(self._selector_thread.selector, local_address, remote_address, on_new_messages, on_error)
+        return UdpTransaction(self._selector, local_address, remote_address, on_new_messages, on_error)
 
     def close(self):
-        del self._selector_thread
+        # the selector is shared, so it is left running for other users
+        self._selector = None
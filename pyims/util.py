@@ -1,13 +1,19 @@
+import sys
 from abc import ABC, abstractmethod
 from typing import Optional
 
 
 class Header(ABC):
+    __slots__ = ()
     __NAME__: Optional[str] = None
-
-    @property
-    def name(self) -> str:
-        return self.__NAME__
+    name: Optional[str] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '__NAME__' in cls.__dict__:
+            # plain class attribute instead of a property, `name` is read on every parse/compose.
+            # interned so dict lookups keyed by header names can match on identity.
+            cls.name = sys.intern(cls.__NAME__)
 
     @abstractmethod
     def parse_from(self, value: str):